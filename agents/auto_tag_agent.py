@@ -12,7 +12,9 @@ class AutoTagAgent(BaseAgent):
             logging.warning("No memory entries found to tag.")
             return ["No assets available for auto-tagging."]
 
-        for entry in memory.memory.values():
+        # Only entries inserted or updated since the last run need tagging
+        entries, cursor = memory.changed_entries("auto_tag")
+        for entry in entries.values():
             tags = set(tag.lower() for tag in entry.get("tags", []))  # Normalize existing tags
             filename = entry.get("filename", "").lower()
             filetype = entry.get("filetype", "").lower().lstrip(".")
@@ -29,5 +31,6 @@ class AutoTagAgent(BaseAgent):
 
             entry["tags"] = sorted(tags)
 
-        memory.save_memory()  # Use public method, assuming you implement or expose it
-        return [f"Auto-tagging complete: {len(memory.memory)} assets updated."]
+        memory.save_memory(source="auto_tag", keys=entries.keys())
+        memory.ack_changes("auto_tag", cursor)
+        return [f"Auto-tagging complete: {len(entries)} assets updated."]
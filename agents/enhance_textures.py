@@ -13,12 +13,17 @@ class EnhanceTexturesAgent(BaseAgent):
         os.makedirs(enhanced_dir, exist_ok=True)
 
         results = []
-        for key, meta in memory.memory.items():
+        enhanced, skipped = [], []
+        # Only entries inserted or updated since the last run need enhancing
+        entries, cursor = memory.changed_entries("enhance_textures")
+        for key, meta in entries.items():
             filename = meta.get("filename")
             source_path = os.path.join("downloads", filename)
             dest_path = os.path.join(enhanced_dir, filename)
 
             if not os.path.exists(source_path):
+                # Not downloaded yet; retried on the next run
+                skipped.append(key)
                 continue
 
             # Simulate enhancement by copying file
@@ -29,7 +34,9 @@ class EnhanceTexturesAgent(BaseAgent):
             meta["enhancement_method"] = "Simulated-Copy"
             meta["quality_score"] = 0.95  # placeholder score
 
+            enhanced.append(key)
             results.append((filename, True, None))
 
-        memory.save_memory()
+        memory.save_memory(source="enhance_textures", keys=enhanced)
+        memory.ack_changes("enhance_textures", cursor, skipped=skipped)
         return results
@@ -9,6 +9,8 @@ from realesrgan import RealESRGANer
 from basicsr.archs.rrdbnet_arch import RRDBNet
 import urllib.request
 from agents.utils.asset_memory import AssetMemory
+from agents.utils.image_encoder import encode_image, PNG, WEBP
+from concurrent.futures import ThreadPoolExecutor
 import json
 
 # Required dependencies: realesrgan, torch, Pillow. Install with: pip install realesrgan torch Pillow
@@ -55,59 +57,112 @@ class EnhanceTexturesSD(BaseAgent):
         self.log(f"Real-ESRGAN model initialized on device: {self.model.device}")
 
 
-    def run(self, input_folder: str, output_folder: str):
+    def run(self, input_folder: str, output_folder: str, output_format: str = "png",
+            compress_level: int = 9, encode_workers: int = 2):
         """
         Enhances textures in the input folder using Real-ESRGAN.
 
+        Encoding runs on a separate worker pool so it overlaps with inference
+        of the next image. Low-color outputs are written as palette PNGs.
+
         Args:
             input_folder: Path to the folder containing input textures.
             output_folder: Path to the folder to save enhanced textures.
+            output_format: "png" (zlib) or "webp" (lossless).
+            compress_level: zlib level 0-9; also scales WebP encoder effort.
+            encode_workers: Number of encoder threads.
 
         Returns:
             A list of dictionaries summarizing the enhancement results.
+
+        Raises:
+            ValueError: If ``output_format`` or ``encode_workers`` is invalid.
         """
+        # Validate before any inference so bad options don't cost a full pass
+        if output_format.lower() not in (PNG, WEBP):
+            raise ValueError(f"Unsupported output format: {output_format} (expected '{PNG}' or '{WEBP}')")
+        if encode_workers < 1:
+            raise ValueError(f"encode_workers must be at least 1, got {encode_workers}")
+
         memory = AssetMemory("downloads/asset_memory.json")
         if not self.model:
             self.log("Model not loaded. Cannot run enhancement.", level="error")
             return []
 
         enhanced_files = []
+        # Memory updates are applied in one pass once the encoder pool drains
+        encoded_fields = {}
         os.makedirs(output_folder, exist_ok=True)
 
-        for filename in os.listdir(input_folder):
-            input_path = os.path.join(input_folder, filename)
-            output_path = os.path.join(output_folder, filename)
-
-            if os.path.isfile(input_path) and filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                self.log(f"Processing {filename}...")
-                try:
-                    # Load image
-                    img = Image.open(input_path).convert("RGB")
-                    img = np.array(img)
-
-                    # Upscale image
-                    enhanced_img, _ = self.model.enhance(img)
-
-                    # Save enhanced image
-                    enhanced_img = Image.fromarray(enhanced_img)
-                    enhanced_img.save(output_path)
-
-                    self.log(f"Successfully enhanced and saved {filename}")
-                    enhanced_files.append({
-                        "original_filename": filename,
-                        "enhanced_filepath": output_path,
-                        "enhancement_status": "success",
-                        "enhancement_method": "Real-ESRGAN"
-                    })
-
-                except Exception as e:
-                    self.log(f"Error processing {filename}: {e}", level="error")
-                    enhanced_files.append({
-                        "original_filename": filename,
-                        "enhanced_filepath": None, # Or output_path if a placeholder is desired
-                        "enhancement_status": "failed",
-                        "enhancement_method": "Real-ESRGAN"
-                    })
+        def collect(filename, future):
+            try:
+                encoded = future.result()
+                self.log(f"Successfully enhanced and saved {filename} "
+                         f"({encoded['bytes']} bytes in {encoded['encode_seconds']}s)")
+                encoded_fields[filename] = {
+                    "enhanced_filepath": encoded["path"],
+                    "enhanced_format": encoded["format"],
+                    "enhanced_palette": encoded["palette"],
+                    "enhanced_bytes": encoded["bytes"],
+                    "encode_seconds": encoded["encode_seconds"],
+                }
+                enhanced_files.append({
+                    "original_filename": filename,
+                    "enhanced_filepath": encoded["path"],
+                    "enhanced_bytes": encoded["bytes"],
+                    "encode_seconds": encoded["encode_seconds"],
+                    "enhancement_status": "success",
+                    "enhancement_method": "Real-ESRGAN"
+                })
+            except Exception as e:
+                self.log(f"Error encoding {filename}: {e}", level="error")
+                enhanced_files.append({
+                    "original_filename": filename,
+                    "enhanced_filepath": None,
+                    "enhancement_status": "failed",
+                    "enhancement_method": "Real-ESRGAN"
+                })
+
+        # Bound in-flight encodes so upscaled frames don't pile up in memory
+        max_pending = encode_workers * 2
+        pending = []
+
+        with ThreadPoolExecutor(max_workers=encode_workers) as encoder:
+            for filename in os.listdir(input_folder):
+                input_path = os.path.join(input_folder, filename)
+                output_path = os.path.join(output_folder, filename)
+
+                if os.path.isfile(input_path) and filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+                    self.log(f"Processing {filename}...")
+                    try:
+                        # Load image
+                        img = Image.open(input_path).convert("RGB")
+                        img = np.array(img)
+
+                        # Upscale image
+                        enhanced_img, _ = self.model.enhance(img)
+
+                        # Hand off to the encoder pool and move on to the next image
+                        future = encoder.submit(encode_image, enhanced_img, output_path,
+                                                output_format=output_format,
+                                                compress_level=compress_level)
+                        pending.append((filename, future))
+                        if len(pending) >= max_pending:
+                            collect(*pending.pop(0))
+
+                    except Exception as e:
+                        self.log(f"Error processing {filename}: {e}", level="error")
+                        enhanced_files.append({
+                            "original_filename": filename,
+                            "enhanced_filepath": None, # Or output_path if a placeholder is desired
+                            "enhancement_status": "failed",
+                            "enhancement_method": "Real-ESRGAN"
+                        })
+
+            for filename, future in pending:
+                collect(filename, future)
+
+        memory.update_by_filenames(encoded_fields, source="enhance_textures_sd")
 
         self.log(f"Enhancement complete. {len(enhanced_files)} files processed.")
         return enhanced_files
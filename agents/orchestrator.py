@@ -5,6 +5,7 @@ import yaml
 import os
 import traceback
 from agents.agent_registry import AGENT_REGISTRY
+from agents.utils.asset_memory import AssetMemory
 from agents.utils.logger import setup_logger
 
 logger = setup_logger("Orchestrator")
@@ -41,6 +42,11 @@ class Orchestrator:
                 logger.info(f"Running agent: {agent.__class__.__name__}")
                 result = agent.run()
                 logger.info(f"Completed: {agent.__class__.__name__}")
+
+            # Drop change log segments every agent has already consumed
+            memory = AssetMemory(os.path.join(self.download_dir, "asset_memory.json"))
+            removed = memory.compact_changes()
+            logger.info(f"Compacted {removed} change log segment(s)")
         except Exception as e:
             logger.error("❌ Pipeline failed:")
             logger.error(traceback.format_exc())
@@ -1,5 +1,5 @@
 """
-Enhanced OpenGameArtScraper with Asset Memory Integration
+Enhanced OpenGameArtScraper with Asset Memory and Crawl Frontier Integration
 """
 
 from bs4 import BeautifulSoup
@@ -11,17 +11,27 @@ from concurrent.futures import ThreadPoolExecutor
 from requests.adapters import HTTPAdapter, Retry
 from agents.utils.logger import setup_logger
 from agents.utils.asset_memory import AssetMemory
+from agents.utils.crawl_frontier import CrawlFrontier, DAY
 from urllib.parse import urlparse
 from datetime import datetime
 
 logger = setup_logger("OpenGameArtScraper")
 
 class OpenGameArtScraper:
-    def __init__(self, base_url="https://opengameart.org", download_dir="downloads", max_workers=5):
+    def __init__(self, base_url="https://opengameart.org", download_dir="downloads", max_workers=5,
+                 recrawl_ttl=7 * DAY, empty_ttl=DAY, search_ttl=DAY, failure_backoff=300, max_backoff=DAY):
         self.base_url = base_url
         self.download_dir = download_dir
         self.max_workers = max_workers
         self.memory = AssetMemory(os.path.join(download_dir, "asset_memory.json"))
+        self.frontier = CrawlFrontier(
+            os.path.join(download_dir, "crawl_frontier.json"),
+            recrawl_ttl=recrawl_ttl,
+            empty_ttl=empty_ttl,
+            search_ttl=search_ttl,
+            failure_backoff=failure_backoff,
+            max_backoff=max_backoff,
+        )
         os.makedirs(download_dir, exist_ok=True)
 
         # Setup retry-capable session
@@ -30,34 +40,53 @@ class OpenGameArtScraper:
         self.session.mount("https://", HTTPAdapter(max_retries=retries))
 
     def fetch_asset_links(self, search_query="pixel art", pages=1):
-        links = []
-        logger.info(f"Searching OpenGameArt for: '{search_query}'")
-        for page in range(1, pages + 1):
-            url = f"{self.base_url}/art-search-advanced?keys={search_query}&page={page - 1}"
-            try:
-                res = self.session.get(url)
-                soup = BeautifulSoup(res.content, "html.parser")
-                for link in soup.select("a[href*='/content/']"):
-                    href = link.get("href")
-                    if href and href.startswith("/content/"):
-                        full_url = f"{self.base_url}{href}"
-                        links.append(full_url)
-            except Exception as e:
-                logger.warning(f"Failed to parse page {page}: {e}")
-        return list(set(links))
+        """
+        Walk the search result pages, resuming from the last checkpoint, and
+        return every detail page in the frontier that is new or due.
+        """
+        start = self.frontier.search_start_page(search_query, pages)
+        if start is None:
+            logger.info(f"Search for '{search_query}' is fresh; skipping search pages")
+        else:
+            logger.info(f"Searching OpenGameArt for: '{search_query}' from page {start + 1}")
+            for page in range(start + 1, pages + 1):
+                url = f"{self.base_url}/art-search-advanced?keys={search_query}&page={page - 1}"
+                try:
+                    res = self.session.get(url)
+                    res.raise_for_status()
+                    soup = BeautifulSoup(res.content, "html.parser")
+                    for link in soup.select("a[href*='/content/']"):
+                        href = link.get("href")
+                        if href and href.startswith("/content/"):
+                            full_url = f"{self.base_url}{href}"
+                            self.frontier.add(full_url, seen=self.memory.has_seen(full_url))
+                except Exception as e:
+                    # Keep the checkpoint at this page so the next run resumes here
+                    logger.warning(f"Failed to parse page {page}: {e}")
+                    break
+                self.frontier.checkpoint_search(search_query, page)
+            else:
+                self.frontier.complete_search(search_query, pages)
+        return self.frontier.due_urls()
 
     def download_assets(self, links):
         def download_link(link):
-            if self.memory.has_seen(link):
-                logger.info(f"Already processed: {link}")
+            # Links not found through search; pages already in asset memory start out as done
+            if self.frontier.get(link) is None:
+                self.frontier.add(link, seen=self.memory.has_seen(link))
+            if not self.frontier.is_due(link):
+                logger.info(f"Not due for recrawl: {link}")
                 return
 
             try:
                 res = self.session.get(link)
+                res.raise_for_status()
                 soup = BeautifulSoup(res.content, "html.parser")
+                asset_count = 0
                 for asset in soup.select("a[href$='.zip'], a[href$='.png'], a[href$='.jpg']"):
                     asset_url = asset.get("href")
                     if asset_url:
+                        asset_count += 1
                         if not asset_url.startswith("http"):
                             asset_url = f"{self.base_url}{asset_url}"
 
@@ -66,6 +95,7 @@ class OpenGameArtScraper:
 
                         if not os.path.exists(filepath):
                             r = self.session.get(asset_url)
+                            r.raise_for_status()
                             with open(filepath, "wb") as f:
                                 f.write(r.content)
                             logger.info(f"Downloaded: {filename}")
@@ -78,8 +108,17 @@ class OpenGameArtScraper:
                                 "tags": ["pixel", "art", "auto"]
                             }
                             self.memory.mark_seen(link, meta)
+
+                if asset_count:
+                    self.frontier.mark_done(link, asset_count)
+                else:
+                    self.frontier.mark_empty(link)
             except Exception as e:
                 logger.warning(f"Failed to download from {link}: {e}")
+                self.frontier.mark_failed(link, e)
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            list(tqdm(executor.map(download_link, links), total=len(links)))
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(tqdm(executor.map(download_link, links), total=len(links)))
+        finally:
+            self.frontier.flush()
@@ -1,12 +1,33 @@
 import os
 import json
+import threading
 from hashlib import sha256
+from agents.utils.change_log import ChangeLog
 
 class AssetMemory:
-    def __init__(self, memory_path="downloads/asset_memory.json"):
+    def __init__(self, memory_path="downloads/asset_memory.json", change_log_dir=None):
         self.memory_path = memory_path
         os.makedirs(os.path.dirname(self.memory_path), exist_ok=True)
-        self.memory = self._load_memory()
+        # Guards self.memory and its entries; reentrant so mutators can save
+        self._lock = threading.RLock()
+
+        # Change feed: digests of the last logged state are kept with the
+        # fingerprint of the memory file they describe. If the file was
+        # written by something else (e.g. the tag editor) the whole memory is
+        # diffed once on load; otherwise only saved keys are ever re-hashed.
+        # The log's directory lock also covers the memory file, so a load
+        # never sees another instance's half-written save.
+        self.changes = ChangeLog(change_log_dir or f"{os.path.splitext(memory_path)[0]}_changes")
+        with self.changes.locked():
+            self.memory = self._load_memory()
+            self._digests, fingerprint = self.changes.load_digests()
+            if self._digests is None:
+                # First run with a change log: treat the existing corpus as the baseline
+                self._digests = {key: self._digest(meta) for key, meta in self.memory.items()}
+                self.changes.save_digests(self._digests, self._fingerprint())
+            elif fingerprint != self._fingerprint():
+                self._record_changes(self.memory.keys() | self._digests.keys(), source=None)
+                self.changes.save_digests(self._digests, self._fingerprint())
 
     def _load_memory(self):
         if os.path.exists(self.memory_path):
@@ -17,18 +38,126 @@ class AssetMemory:
                 pass
         return {}
 
-    def save_memory(self):
-        with open(self.memory_path, "w") as f:
-            json.dump(self.memory, f, indent=2)
+    def _fingerprint(self):
+        if not os.path.exists(self.memory_path):
+            return None
+        stat = os.stat(self.memory_path)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @staticmethod
+    def _digest(meta):
+        return sha256(json.dumps(meta, sort_keys=True).encode()).hexdigest()
+
+    def _record_changes(self, keys, source):
+        changes = []
+        for key in keys:
+            previous = self._digests.get(key)
+            if key in self.memory:
+                digest = self._digest(self.memory[key])
+                if previous is None:
+                    changes.append(("insert", key))
+                elif previous != digest:
+                    changes.append(("update", key))
+                self._digests[key] = digest
+            elif previous is not None:
+                changes.append(("delete", key))
+                del self._digests[key]
+        if changes:
+            self.changes.append(changes, source=source)
+
+    def save_memory(self, source=None, keys=None):
+        """
+        Write memory to disk and log what changed. Pass ``keys`` when the
+        changed entries are known; otherwise every entry is re-hashed.
+        """
+        with self._lock, self.changes.locked():
+            if keys is None:
+                keys = self.memory.keys() | self._digests.keys()
+            # Log before writing so a crash in between replays a change rather than losing one
+            self._record_changes(keys, source)
+            with open(self.memory_path, "w") as f:
+                json.dump(self.memory, f, indent=2)
+            self.changes.save_digests(self._digests, self._fingerprint())
 
     def has_seen(self, asset_url):
         key = sha256(asset_url.encode()).hexdigest()
         return key in self.memory
 
-    def mark_seen(self, asset_url, meta):
+    def mark_seen(self, asset_url, meta, source=None):
         key = sha256(asset_url.encode()).hexdigest()
-        self.memory[key] = meta
-        self.save_memory()
+        with self._lock:
+            self.memory[key] = meta
+            self.save_memory(source, keys=[key])
 
     def get_all_metadata(self):
         return list(self.memory.values())
+
+    def update_entries(self, match, fields, source=None):
+        """Apply ``fields`` to every entry for which ``match(entry)`` is true."""
+        with self._lock:
+            keys = [key for key, entry in self.memory.items() if match(entry)]
+            for key in keys:
+                self.memory[key].update(fields)
+            if keys:
+                self.save_memory(source, keys=keys)
+            return len(keys)
+
+    def update_by_filename(self, filename, fields, source=None):
+        return self.update_entries(lambda entry: entry.get("filename") == filename, fields, source)
+
+    def update_by_filenames(self, fields_by_filename, source=None):
+        """Apply ``{filename: fields}`` in one pass over memory and one save."""
+        with self._lock:
+            keys = []
+            for key, entry in self.memory.items():
+                fields = fields_by_filename.get(entry.get("filename"))
+                if fields is not None:
+                    entry.update(fields)
+                    keys.append(key)
+            if keys:
+                self.save_memory(source, keys=keys)
+            return len(keys)
+
+    def changes_since(self, consumer):
+        """
+        Return ``(changes, cursor)`` for ``consumer``: the change records
+        logged since its cursor, excluding its own writes, and the cursor to
+        pass to ``ack_changes`` once they are processed. Keys the consumer
+        acknowledged as skipped are returned again as ``retry`` records.
+
+        A consumer without a cursor, or whose cursor predates the compacted
+        log, gets every current entry as an insert.
+        """
+        cursor = self.changes.get_cursor(consumer)
+        if cursor is None or cursor < self.changes.oldest_seq() - 1:
+            head = self.changes.head_seq
+            changes = [{"seq": head, "op": "insert", "key": key, "source": None}
+                       for key in self.memory]
+            return changes, head
+        # read_since reloads the log state; holding the lock keeps head_seq
+        # from moving past records that were not returned
+        with self.changes.locked():
+            changes = self.changes.read_since(cursor, exclude_source=consumer)
+            head = self.changes.head_seq
+        retries = [{"seq": cursor, "op": "retry", "key": key, "source": None}
+                   for key in self.changes.get_pending(consumer)]
+        return retries + changes, head
+
+    def changed_entries(self, consumer):
+        """
+        Collapse ``changes_since`` to the current entries that were inserted,
+        updated or left for retry. Returns ``({key: meta}, cursor)``.
+        """
+        changes, cursor = self.changes_since(consumer)
+        entries = {c["key"]: self.memory[c["key"]] for c in changes if c["key"] in self.memory}
+        return entries, cursor
+
+    def ack_changes(self, consumer, cursor, skipped=None):
+        """
+        Advance ``consumer`` to ``cursor``. Keys in ``skipped`` could not be
+        handled yet and are returned again by the next ``changes_since``.
+        """
+        self.changes.set_cursor(consumer, cursor, pending=skipped)
+
+    def compact_changes(self):
+        return self.changes.compact()
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from glob import glob
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; fall back to in-process locking only
+    fcntl = None
+
+
+class _DirLock:
+    """
+    Reentrant lock for one log directory, shared by every ChangeLog in the
+    process and, where ``fcntl`` is available, held as an exclusive
+    ``flock`` on a lock file so other processes are excluded too.
+    """
+
+    def __init__(self, lock_path):
+        self._lock_path = lock_path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._handle = None
+
+    def __enter__(self):
+        self._rlock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                handle = open(self._lock_path, "a")
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            except Exception:
+                self._rlock.release()
+                raise
+            self._handle = handle
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0 and self._handle is not None:
+            fcntl.flock(self._handle, fcntl.LOCK_UN)
+            self._handle.close()
+            self._handle = None
+        self._rlock.release()
+
+
+_DIR_LOCKS = {}
+_DIR_LOCKS_GUARD = threading.Lock()
+
+
+def _dir_lock(log_dir):
+    key = os.path.realpath(log_dir)
+    with _DIR_LOCKS_GUARD:
+        if key not in _DIR_LOCKS:
+            _DIR_LOCKS[key] = _DirLock(os.path.join(key, ".lock"))
+        return _DIR_LOCKS[key]
+
+
+class ChangeLog:
+    """
+    Append-only, segmented log of asset memory changes with durable
+    per-consumer cursors.
+
+    Every change gets a monotonically increasing sequence number. Records are
+    appended to JSON-lines segment files holding ``segment_size`` sequence
+    numbers each, so reading from a cursor only opens the segments after it
+    and compaction drops whole segments every consumer has moved past. The
+    segment size is fixed in ``state.json`` when the log is created so every
+    instance agrees on segment boundaries.
+
+    All reads and writes of one log directory go through a lock shared by
+    every instance in the process and a file lock across processes; use
+    ``locked()`` to extend it over related writes.
+    """
+
+    def __init__(self, log_dir, segment_size=1000):
+        self.log_dir = log_dir
+        self.state_path = os.path.join(log_dir, "state.json")
+        self.digests_path = os.path.join(log_dir, "digests.json")
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._lock = _dir_lock(self.log_dir)
+        with self._lock:
+            self.state = self._load_json(self.state_path, {"head_seq": 0, "cursors": {}})
+            if "segment_size" not in self.state:
+                self.state["segment_size"] = segment_size
+                self._write_json(self.state_path, self.state)
+        self.segment_size = self.state["segment_size"]
+
+    def locked(self):
+        """Return the directory lock, for use as a context manager."""
+        return self._lock
+
+    def _load_json(self, path, default):
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    return json.load(f)
+            except Exception:
+                pass
+        return default
+
+    def _write_json(self, path, data, **dump_kwargs):
+        fd, tmp_path = tempfile.mkstemp(dir=self.log_dir, prefix=os.path.basename(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, **(dump_kwargs or {"indent": 2}))
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _segment_start(self, seq):
+        return (seq - 1) // self.segment_size * self.segment_size + 1
+
+    def _segment_path(self, start):
+        return os.path.join(self.log_dir, f"segment-{start:012d}.jsonl")
+
+    def _segments(self):
+        """Return the first sequence number of every retained segment, oldest first."""
+        starts = []
+        for path in glob(os.path.join(self.log_dir, "segment-*.jsonl")):
+            name = os.path.basename(path)
+            starts.append(int(name[len("segment-"):-len(".jsonl")]))
+        return sorted(starts)
+
+    def _refresh(self):
+        # Other AssetMemory instances may share this log directory
+        self.state = self._load_json(self.state_path, self.state)
+
+    @property
+    def head_seq(self):
+        return self.state["head_seq"]
+
+    def oldest_seq(self):
+        """Return the oldest sequence number still readable from the log."""
+        segments = self._segments()
+        return segments[0] if segments else self.head_seq + 1
+
+    def load_digests(self):
+        """
+        Return ``(digests, fingerprint)`` as last saved with ``save_digests``,
+        or ``(None, None)`` if the log has no digests yet.
+        """
+        saved = self._load_json(self.digests_path, None)
+        if saved is None:
+            return None, None
+        return saved.get("digests", {}), saved.get("fingerprint")
+
+    def save_digests(self, digests, fingerprint):
+        """
+        Persist the per-key content hashes of the logged memory state and the
+        ``fingerprint`` of the memory file they describe.
+        """
+        with self._lock:
+            self._write_json(self.digests_path, {"fingerprint": fingerprint, "digests": digests},
+                             separators=(",", ":"))
+
+    def append(self, changes, source=None):
+        """Append ``(op, key)`` pairs and return the new head sequence number."""
+        with self._lock:
+            self._refresh()
+            if changes:
+                now = time.time()
+                seq = self.state["head_seq"]
+                handle, handle_start = None, None
+                try:
+                    for op, key in changes:
+                        seq += 1
+                        start = self._segment_start(seq)
+                        if start != handle_start:
+                            if handle:
+                                handle.close()
+                            handle = open(self._segment_path(start), "a")
+                            handle_start = start
+                        handle.write(json.dumps({
+                            "seq": seq, "op": op, "key": key, "source": source, "ts": now
+                        }) + "\n")
+                finally:
+                    if handle:
+                        handle.close()
+                self.state["head_seq"] = seq
+                self._write_json(self.state_path, self.state)
+            return self.state["head_seq"]
+
+    def read_since(self, seq, exclude_source=None):
+        """Return records with a sequence number above ``seq``, oldest first."""
+        with self._lock:
+            return self._read_since(seq, exclude_source)
+
+    def _read_since(self, seq, exclude_source):
+        self._refresh()
+        # Keyed by seq so that records left past the head by an interrupted
+        # append are superseded by the ones written after it
+        records = {}
+        for start in self._segments():
+            if start + self.segment_size - 1 <= seq:
+                continue
+            with open(self._segment_path(start), "r") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record["seq"] <= seq or record["seq"] > self.head_seq:
+                        continue
+                    records[record["seq"]] = record
+        if exclude_source:
+            records = {s: r for s, r in records.items() if r.get("source") != exclude_source}
+        return [records[s] for s in sorted(records)]
+
+    def get_cursor(self, consumer):
+        return self.state["cursors"].get(consumer)
+
+    def get_pending(self, consumer):
+        """Return the keys ``consumer`` acknowledged without handling."""
+        return self.state.get("pending", {}).get(consumer, [])
+
+    def set_cursor(self, consumer, seq, pending=None):
+        with self._lock:
+            self._refresh()
+            self.state["cursors"][consumer] = seq
+            if pending:
+                self.state.setdefault("pending", {})[consumer] = sorted(pending)
+            else:
+                self.state.get("pending", {}).pop(consumer, None)
+            self._write_json(self.state_path, self.state)
+
+    def remove_cursor(self, consumer):
+        with self._lock:
+            self._refresh()
+            self.state["cursors"].pop(consumer, None)
+            self.state.get("pending", {}).pop(consumer, None)
+            self._write_json(self.state_path, self.state)
+
+    def compact(self):
+        """
+        Delete segments that every registered consumer has read past.
+        The segment holding the head is always kept. Returns the number of
+        segments removed.
+        """
+        with self._lock:
+            self._refresh()
+            cursors = self.state["cursors"].values()
+            low_water = min(cursors) if cursors else self.head_seq
+            head_start = self._segment_start(self.head_seq) if self.head_seq else None
+            removed = 0
+            for start in self._segments():
+                if start == head_start or start + self.segment_size - 1 > low_water:
+                    continue
+                os.remove(self._segment_path(start))
+                removed += 1
+            return removed
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import threading
+
+DAY = 24 * 60 * 60
+
+
+class CrawlFrontier:
+    """
+    Persistent per-URL crawl state plus search-page checkpoints.
+
+    Each detail page URL is tracked as pending, done, empty or failed together
+    with when it was last fetched and when it may next be fetched. Failed
+    pages back off exponentially; done and empty pages are recrawled after
+    their TTL so updated packs are picked up.
+
+    Discovered URLs are written out with each search checkpoint and status
+    changes at most every ``save_interval`` seconds; call ``flush`` when a
+    crawl finishes.
+    """
+
+    PENDING = "pending"
+    DONE = "done"
+    EMPTY = "empty"
+    FAILED = "failed"
+
+    def __init__(self, frontier_path="downloads/crawl_frontier.json",
+                 recrawl_ttl=7 * DAY, empty_ttl=DAY, search_ttl=DAY,
+                 failure_backoff=300, max_backoff=DAY, save_interval=5.0):
+        self.frontier_path = frontier_path
+        self.recrawl_ttl = recrawl_ttl
+        self.empty_ttl = empty_ttl
+        self.search_ttl = search_ttl
+        self.failure_backoff = failure_backoff
+        self.max_backoff = max_backoff
+        self.save_interval = save_interval
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.frontier_path), exist_ok=True)
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if os.path.exists(self.frontier_path):
+            try:
+                with open(self.frontier_path, "r") as f:
+                    state = json.load(f)
+                state.setdefault("urls", {})
+                state.setdefault("searches", {})
+                return state
+            except Exception:
+                pass
+        return {"urls": {}, "searches": {}}
+
+    def save_state(self):
+        # Write to a temp file first so an interrupted run never leaves a
+        # truncated frontier behind.
+        tmp_path = f"{self.frontier_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.frontier_path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def flush(self):
+        """Write out any changes not yet saved."""
+        with self._lock:
+            if self._dirty:
+                self.save_state()
+
+    # -- Detail pages -----------------------------------------------------
+
+    def get(self, url):
+        return self.state["urls"].get(url)
+
+    def add(self, url, seen=False):
+        """
+        Record a newly discovered URL as pending. Known URLs are left as-is.
+        A URL already ``seen`` in asset memory starts out as done and is only
+        recrawled after ``recrawl_ttl``.
+        """
+        with self._lock:
+            if url in self.state["urls"]:
+                return False
+            self.state["urls"][url] = {
+                "status": self.DONE if seen else self.PENDING,
+                "last_fetched": None,
+                "next_eligible": time.time() + self.recrawl_ttl if seen else 0,
+                "failures": 0,
+            }
+            self._dirty = True
+            return True
+
+    def is_due(self, url, now=None):
+        entry = self.get(url)
+        if entry is None:
+            return True
+        now = time.time() if now is None else now
+        return entry.get("next_eligible", 0) <= now
+
+    def due_urls(self, now=None):
+        now = time.time() if now is None else now
+        return [url for url, entry in self.state["urls"].items()
+                if entry.get("next_eligible", 0) <= now]
+
+    def _record(self, url, status, delay, **extra):
+        now = time.time()
+        with self._lock:
+            entry = self.state["urls"].setdefault(url, {"failures": 0})
+            entry.update(extra)
+            entry["status"] = status
+            entry["last_fetched"] = now
+            entry["next_eligible"] = now + delay
+            self._dirty = True
+            if time.monotonic() - self._last_save >= self.save_interval:
+                self.save_state()
+
+    def mark_done(self, url, asset_count=0):
+        self._record(url, self.DONE, self.recrawl_ttl,
+                     failures=0, asset_count=asset_count, error=None)
+
+    def mark_empty(self, url):
+        self._record(url, self.EMPTY, self.empty_ttl,
+                     failures=0, asset_count=0, error=None)
+
+    def mark_failed(self, url, error=None):
+        entry = self.get(url) or {}
+        failures = entry.get("failures", 0) + 1
+        delay = min(self.failure_backoff * 2 ** (failures - 1), self.max_backoff)
+        self._record(url, self.FAILED, delay,
+                     failures=failures, error=str(error) if error else None)
+
+    # -- Search pages -----------------------------------------------------
+
+    def search_start_page(self, query, pages, now=None):
+        """
+        Return the first search page still to fetch for ``query``, or ``None``
+        if all ``pages`` were fetched within ``search_ttl``.
+        """
+        now = time.time() if now is None else now
+        search = self.state["searches"].get(query)
+        if search is None:
+            return 0
+        completed_at = search.get("completed_at")
+        if completed_at is not None:
+            if completed_at + self.search_ttl <= now:
+                return 0
+            done_pages = search.get("pages", 0)
+            return None if done_pages >= pages else done_pages
+        return search.get("next_page", 0)
+
+    def checkpoint_search(self, query, next_page):
+        with self._lock:
+            search = self.state["searches"].setdefault(query, {})
+            search["next_page"] = next_page
+            search["completed_at"] = None
+            self.save_state()
+
+    def complete_search(self, query, pages):
+        with self._lock:
+            self.state["searches"][query] = {
+                "next_page": 0,
+                "pages": pages,
+                "completed_at": time.time(),
+            }
+            self.save_state()
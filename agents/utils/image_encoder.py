@@ -0,0 +1,78 @@
+import os
+import time
+import numpy as np
+from PIL import Image
+
+# Output formats accepted by encode_image
+PNG = "png"
+WEBP = "webp"
+
+
+def count_colors(img, max_colors=256):
+    """Return the number of distinct colors in ``img``, or None if above ``max_colors``."""
+    colors = img.getcolors(maxcolors=max_colors)
+    return len(colors) if colors is not None else None
+
+
+def to_palette(img):
+    """
+    Convert a low-color RGB or L image to a "P" image without losing any
+    pixel values. Unlike ``Image.quantize`` the palette is built from the
+    exact colors present, so the round trip is lossless.
+    """
+    pixels = np.asarray(img.convert("RGB"))
+    colors, indices = np.unique(pixels.reshape(-1, 3), axis=0, return_inverse=True)
+    # putpalette switches the "L" index image over to "P" mode
+    paletted = Image.fromarray(indices.reshape(pixels.shape[:2]).astype(np.uint8))
+    paletted.putpalette(colors.astype(np.uint8).flatten().tolist())
+    return paletted
+
+
+def encode_image(img, output_path, output_format=PNG, compress_level=9, max_palette_colors=256):
+    """
+    Encode ``img`` to ``output_path`` in a size-optimized form.
+
+    Args:
+        img: PIL image or HxWxC uint8 array.
+        output_path: Destination path. If its extension does not match
+            ``output_format`` the format's extension is appended
+            (``foo.jpg`` -> ``foo.jpg.png``) so inputs sharing a stem
+            never map to the same file.
+        output_format: "png" for zlib-compressed PNG or "webp" for lossless WebP.
+        compress_level: zlib level (0-9) for PNG; WebP effort is scaled from it.
+        max_palette_colors: Opaque images with at most this many colors are
+            written as palette PNGs. Set to 0 to disable.
+
+    Returns:
+        A dictionary with the written path, byte size, encode time and whether
+        a palette was used.
+    """
+    start = time.perf_counter()
+    if not isinstance(img, Image.Image):
+        img = Image.fromarray(img)
+
+    output_format = output_format.lower()
+    if os.path.splitext(output_path)[1].lower() != f".{output_format}":
+        output_path = f"{output_path}.{output_format}"
+    palette = False
+
+    if output_format == WEBP:
+        # Pillow's WebP "method" runs 0-6, trading encode time for size
+        img.save(output_path, format="WEBP", lossless=True, quality=100,
+                 method=round(compress_level * 6 / 9))
+    elif output_format == PNG:
+        if max_palette_colors and img.mode in ("RGB", "L") \
+                and count_colors(img, max_palette_colors) is not None:
+            img = to_palette(img)
+            palette = True
+        img.save(output_path, format="PNG", compress_level=compress_level)
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    return {
+        "path": output_path,
+        "format": output_format,
+        "palette": palette,
+        "bytes": os.path.getsize(output_path),
+        "encode_seconds": round(time.perf_counter() - start, 4),
+    }
@@ -53,11 +53,11 @@ class AssetVerifier:
             }, f, indent=2)
 
         # Update asset memory entry if match found
-        for entry in self.memory.memory.values():
-            if root.endswith(entry.get("filename", "")):
-                entry["verified"] = verified
-                entry["license_score"] = license_score
-        self.memory._save_memory()
+        self.memory.update_entries(
+            lambda entry: root.endswith(entry.get("filename", "")),
+            {"verified": verified, "license_score": license_score},
+            source="verify_assets",
+        )
 
         return root, verified, license_score
 
@@ -63,9 +63,12 @@ def asset_memory_dashboard(memory_path="downloads/asset_memory.json"):
             st.markdown(f"**Enhanced At:** {meta.get('enhanced_at', 'Not yet')}")
             st.markdown(f"**Enhancement Method:** {meta.get('enhancement_method', '-')}")
             st.markdown(f"**Quality Score:** {meta.get('quality_score', '-')}")
+            st.markdown(f"**Enhanced Size:** {meta.get('enhanced_bytes', '-')} bytes "
+                        f"({meta.get('enhanced_format', '-')}, palette: {meta.get('enhanced_palette', '-')})")
+            st.markdown(f"**Encode Time:** {meta.get('encode_seconds', '-')} s")
             
             orig_path = os.path.join("downloads", filename)
-            enhanced_path = os.path.join("downloads", "enhanced", filename)
+            enhanced_path = meta.get("enhanced_filepath") or os.path.join("downloads", "enhanced", filename)
 
             if os.path.exists(orig_path):
                 st.image(orig_path, caption="Original", width=256)